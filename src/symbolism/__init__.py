@@ -1,6 +1,6 @@
 """Gives users direct access to class and functions."""
 from symbolism.symbolism import \
-    symbol, \
+    symbol, compiled, group_and_compile, set_fold, \
     and_, or_, \
     add_, sub_, mul_, matmul_, div_, truediv_, floordiv_, mod_, pow_, \
     lshift_, rshift_, bitor_, bar_, bitxor_, xor_, bitand_, amp_, \
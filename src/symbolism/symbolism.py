@@ -2,11 +2,74 @@
 Extensible combinator library for building symbolic expressions that
 can be evaluated at a later time.
 """
+# pylint: disable=too-many-lines
 from __future__ import annotations
-from typing import Any, Union, Iterable
-import doctest
+from typing import Any, Optional, Union, Iterable, Callable, TYPE_CHECKING
+import operator
+
+if TYPE_CHECKING: # pragma: no cover
+    from concurrent.futures import Executor, Future
+
+# Opcodes of the instructions within a program produced by :obj:`symbol.compile`.
+_LEAF = 0
+_CALL = 1
+_LOAD = 2
+_JUMP_IF_FALSE_OR_POP = 3
+_JUMP_IF_TRUE_OR_POP = 4
+
+# Whether applications of the pre-defined operators to leaf instances that have
+# immutable values are computed when they are created (see :obj:`_fold`). Use
+# :obj:`set_fold` to change it (assigning a new value to this name through the
+# package has no effect on this module).
+SYMBOLISM_FOLD = True
+
+def set_fold(enabled: bool) -> bool:
+    """
+    Enable or disable the computation of applications of the pre-defined
+    operators to leaf instances that have immutable values when they are
+    created (see :obj:`symbol.__call__`), and return the previous setting.
+
+    >>> previous = set_fold(False)
+    >>> try:
+    ...     len(symbol(2) + symbol(3))
+    ... finally:
+    ...     _ = set_fold(previous)
+    2
+    >>> (previous, len(symbol(2) + symbol(3)))
+    (True, 0)
+    """
+    global SYMBOLISM_FOLD # pylint: disable=global-statement
+    (previous, SYMBOLISM_FOLD) = (SYMBOLISM_FOLD, enabled)
+    return previous
+
+# Maximum depth up to which :obj:`symbol.evaluate` relies on recursion.
+_RECURSION_DEPTH = 100
+
+# Types of the leaf instances that can be folded (see :obj:`_fold`).
+_IMMUTABLE = (bool, int, float, complex, str, bytes, tuple, frozenset, type(None))
+
+def _immutable(value: Any) -> bool:
+    """
+    Determine whether a value is of an immutable type (used to decide which
+    leaf instances can be folded and which are constant).
+
+    >>> (_immutable((1, 'a')), _immutable(([2],)), _immutable([3]))
+    (True, False, False)
+    """
+    if not isinstance(value, _IMMUTABLE):
+        return False
 
-class symbol:
+    # Tuples and frozen sets are immutable only if their items are (which holds
+    # approximately if they are hashable).
+    if isinstance(value, (tuple, frozenset)):
+        try:
+            hash(value)
+        except TypeError:
+            return False
+
+    return True
+
+class symbol: # pylint: disable=too-many-instance-attributes
     """
     Instances of this class represent individual symbolic values, as well as
     entire symbolic expressions (*i.e.*, trees consisting of nested :obj:`symbol`
@@ -35,7 +98,32 @@ class symbol:
     >>> conjunction = and_(symbol(True), symbol(False))
     >>> conjunction.evaluate()
     False
+
+    Most of these constants wrap the corresponding built-in functions found in
+    the :obj:`operator` module.
+
+    >>> operations = [sub_, truediv_, floordiv_, mod_, pow_, lshift_, rshift_]
+    >>> [o(symbol(5), symbol(2)).evaluate() for o in operations]
+    [3, 2.5, 2, 1, 25, 20, 1]
+    >>> operations = [bitxor_, eq_, ne_, lt_, le_, gt_, ge_, is_]
+    >>> [o(symbol(5), symbol(2)).evaluate() for o in operations]
+    [7, False, True, False, False, True, True, False]
+    >>> [o(symbol(5)).evaluate() for o in [invert_, pos_, neg_]]
+    [-6, 5, -5]
     """
+    # pylint: disable=protected-access # Methods access attributes of other nodes.
+
+    # Nodes are created for every subexpression, so their attributes are stored
+    # in slots rather than in a dictionary.
+    __slots__ = (
+        'instance', 'parameters', '_kwnames', '_leaf', '_constant', '_function', '_uses', '_memo'
+    )
+
+    # Overloading :obj:`__eq__` would otherwise make instances unhashable. The
+    # hash of an instance is based on its identity (so distinct live instances
+    # never have the same hash and :obj:`__eq__` is not used by dictionaries).
+    __hash__ = object.__hash__
+
     def __init__(self: symbol, instance: Any):
         """
         Create a symbol from an instance (*e.g.*, value, object, or
@@ -45,9 +133,34 @@ class symbol:
         >>> add_ = symbol(add)
         >>> add_.instance(1, 2)
         3
+
+        All attributes of instances are declared using ``__slots__`` (so there
+        is no per-instance dictionary of attributes).
+
+        >>> hasattr(add_, '__dict__')
+        False
+
+        Instances are hashable (by identity), so they can be stored in sets and
+        used as dictionary keys.
+
+        >>> x = symbol(1)
+        >>> len({x, x, symbol(1)})
+        2
+
+        The ``parameters`` attribute of an instance created in this way is an
+        empty :obj:`tuple`.
+
+        >>> add_.parameters
+        ()
         """
         self.instance = instance
-        self.parameters = None
+        self.parameters = ()
+        self._kwnames = None
+        self._leaf = True # Distinguishes leaves from applications to no parameters.
+        self._constant = _immutable(instance)
+        self._function = instance # Applied to the values of the parameters (see :obj:`_node`).
+        self._uses = 0 # Number of applications that have this node as a parameter.
+        self._memo = None # Values stored by other methods (see :obj:`_remember`).
 
     def __call__(self: symbol, *args, **kwargs) -> symbol:
         """
@@ -64,11 +177,12 @@ class symbol:
         >>> e.parameters[0].instance
         1
 
-        Keyword arguments are also supported. However, note that the keywords
-        are preserved only in the keys of the ``parameters`` attribute (which in
-        this case is instantiated as a dictionary). The indexing method
-        :obj:`~symbol.__getitem__` and the iteration method :obj:`~symbol.__iter__`
-        only support positional integer indexing and (where applicable) slicing.
+        Keyword arguments are also supported. However, note that the
+        ``parameters`` attribute is always a :obj:`tuple` and the keywords are
+        preserved only in the keys of the :obj:`~symbol.kwargs` property. The
+        indexing method :obj:`~symbol.__getitem__` and the iteration method
+        :obj:`~symbol.__iter__` only support positional integer indexing and
+        slicing.
 
         >>> add = lambda x, y: x + y
         >>> add_ = symbol(add)
@@ -77,7 +191,9 @@ class symbol:
         True
         >>> len(e.parameters)
         2
-        >>> e.parameters['x'].instance
+        >>> e.parameters[0].instance
+        1
+        >>> e.kwargs['x'].instance
         1
 
         Positional and keyword arguments cannot be mixed.
@@ -88,14 +204,191 @@ class symbol:
         Traceback (most recent call last):
           ...
         ValueError: cannot mix positional and keyword arguments
+
+        Every application creates a new :obj:`symbol` instance (structurally
+        identical subexpressions can be merged explicitly using :obj:`cse`), so
+        applications of impure instances are evaluated separately.
+
+        >>> x = symbol([1])
+        >>> (x - x) is (x - x)
+        False
+        >>> from itertools import count
+        >>> c = count()
+        >>> tick = symbol(lambda: next(c))
+        >>> symbol(lambda a, b: (a, b))(tick(), tick()).evaluate()
+        (0, 1)
+
+        The pre-defined operator constants are pure functions. When one of these
+        is applied only to leaf instances, the result is computed immediately
+        and a leaf instance is returned.
+
+        >>> e = symbol(2) + symbol(3)
+        >>> e.parameters
+        ()
+        >>> e.instance
+        5
+
+        Only leaf instances that have immutable values (such as numbers,
+        strings, and tuples) are folded in this way, as the values of other
+        instances may change before the expression is evaluated.
+
+        >>> x = [3]
+        >>> e = symbol(x) + symbol([4])
+        >>> len(e)
+        2
+        >>> x.append(5)
+        >>> e.evaluate()
+        [3, 5, 4]
+
+        Folding can be disabled using :obj:`set_fold`.
+
+        >>> previous = set_fold(False)
+        >>> try:
+        ...     len(symbol(2) + symbol(3))
+        ... finally:
+        ...     _ = set_fold(previous)
+        2
+
+        If the computation fails, evaluation of the expression is deferred (so
+        that any exception is raised only when the expression is evaluated).
+
+        >>> e = symbol(1) / symbol(0)
+        >>> len(e)
+        2
+        >>> e.evaluate()
+        Traceback (most recent call last):
+          ...
+        ZeroDivisionError: division by zero
         """
         if len(args) > 0 and len(kwargs) > 0:
             raise ValueError('cannot mix positional and keyword arguments')
 
-        s = symbol(self.instance)
-        s.parameters = args if len(kwargs) == 0 else kwargs
+        if len(kwargs) == 0:
+            return self._apply(args)
+
+        return self._apply(tuple(kwargs.values()), tuple(kwargs.keys()))
+
+    def _apply(self: symbol, parameters: tuple, kwnames: tuple = None) -> symbol:
+        """
+        Create a symbolic expression via application of this instance to a
+        :obj:`tuple` of parameters (and, optionally, a :obj:`tuple` of keywords
+        for those parameters). All infix and prefix operators use this method
+        directly (rather than :obj:`__call__`) to avoid packing and validating
+        their arguments.
+
+        >>> e = symbol(lambda x, y: x + y)._apply((symbol(1), symbol(2)))
+        >>> e.evaluate()
+        3
+        >>> e = symbol(lambda x, y: x + y)._apply((symbol(1), symbol(2)), ('x', 'y'))
+        >>> e.kwargs['y'].instance
+        2
+        """
+        if id(self.instance) in _pure and kwnames is None and len(parameters) > 0:
+            folded = _fold(self.instance, parameters)
+            if folded is not None:
+                return folded
+
+        return self._node(parameters, kwnames)
+
+    def _node(self: symbol, parameters: tuple, kwnames: tuple = None) -> symbol:
+        """
+        Create a new application of this instance to a :obj:`tuple` of
+        parameters (used by :obj:`_apply` and :obj:`_apply2`).
+
+        >>> x = symbol([1])
+        >>> add_._node((x, x)) is add_._node((x, x))
+        False
+
+        Applications of pre-defined operators to one or two parameters apply
+        the equivalent built-in functions.
+
+        >>> (add_._node((x, x))._function, add_._node((x, x, x))._function is _add_)
+        (<built-in function add>, True)
+        """
+        # All attributes are assigned directly (rather than by invoking
+        # :obj:`__init__` and then replacing most of them).
+        s = symbol.__new__(symbol)
+        s.instance = self.instance
+        s.parameters = parameters
+        s._kwnames = kwnames
+        s._leaf = False
+        s._constant = id(self.instance) in _pure
+        s._function = self._function if len(parameters) <= 2 else self.instance
+        s._uses = 0
+        s._memo = None
+        for p in parameters:
+            if isinstance(p, symbol):
+                p._uses += 1
+                s._constant = s._constant and p._constant
+            else:
+                s._constant = False
         return s
 
+    def __getstate__(self: symbol) -> dict:
+        """
+        Return the state of this instance (used by :obj:`pickle` and
+        :obj:`copy`). Values stored by other methods (such as compiled programs
+        and functions) and the number of uses are omitted, as they are not
+        necessarily valid for a copy.
+
+        >>> import pickle, copy
+        >>> e = symbol(abs)(symbol(-2)) - symbol(1)
+        >>> (e.njit()(), e.evaluate_cached(), e.compile() is not None)
+        (1, 1, True)
+        >>> [pickle.loads(pickle.dumps(e)).evaluate(), copy.deepcopy(e).evaluate()]
+        [1, 1]
+        >>> (copy.deepcopy(e)._memo, copy.deepcopy(e).parameters[0]._uses)
+        (None, 1)
+        """
+        return {
+            name: getattr(self, name)
+            for name in symbol.__slots__ if name not in ('_uses', '_memo')
+        }
+
+    def __setstate__(self: symbol, state: dict):
+        """
+        Restore the state of this instance (used by :obj:`pickle` and
+        :obj:`copy`). The parameters of an application are complete by the time
+        its state is restored, so their numbers of uses are updated as in
+        :obj:`_node`.
+
+        >>> import copy
+        >>> x = symbol([1])
+        >>> e = copy.copy(x + x)
+        >>> (e.parameters[0] is x, x._uses)
+        (True, 4)
+        """
+        for (name, value) in state.items():
+            setattr(self, name, value)
+        self._uses = 0
+        self._memo = None
+        for p in self.parameters:
+            if isinstance(p, symbol):
+                p._uses += 1
+
+    def _apply2(self: symbol, left: Any, right: Any) -> symbol:
+        """
+        Variant of :obj:`_apply` that is specialized for exactly two positional
+        parameters (used by all binary operators).
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> (x, y) = (inc(symbol(1)), inc(symbol(2)))
+        >>> e = add_._apply2(x, y)
+        >>> (e.parameters[0] is x, e.parameters[1] is y)
+        (True, True)
+        >>> e.evaluate()
+        5
+        >>> add_._apply2(symbol(1), symbol(2)).instance
+        3
+        """
+        parameters = (left, right)
+        if id(self.instance) in _pure:
+            folded = _fold(self.instance, parameters)
+            if folded is not None:
+                return folded
+
+        return self._node(parameters)
+
     def __getitem__(self: symbol, key: Union[int, slice]) -> Union[Any, list, tuple]:
         """
         Retrieve an instance parameter using an integer index, or retrieve a
@@ -111,17 +404,20 @@ class symbol:
         >>> [e[i].instance for (i, p) in enumerate(e)]
         [1, 2]
 
-        Slice notation is also supported when the ``parameters``
-        attribute supports it.
+        Slice notation is also supported.
 
         >>> [s.instance for s in e[0:2]]
         [1, 2]
+
+        Parameters supplied as keyword arguments are retrieved by position
+        (directly from the ``parameters`` tuple, without building any
+        intermediate sequence).
+
+        >>> e = add_(x=symbol(1), y=symbol(2))
+        >>> (e[1].instance, [s.instance for s in e[-2:]])
+        (2, [1, 2])
         """
-        return (
-            list(self.parameters.values())[key] # pylint: disable=no-member
-            if isinstance(self.parameters, dict) else
-            self.parameters[key] # Should be a :obj:`tuple`; see :obj:`__init__`.
-        )
+        return self.parameters[key]
 
     def __iter__(self: symbol) -> Iterable:
         """
@@ -137,7 +433,7 @@ class symbol:
 
         Even if keyword arguments are used when this instance is instantiated,
         the iteration returns the actual parameter instances (and **not** the
-        keys of the ``parameters`` attribute).
+        keys of the :obj:`~symbol.kwargs` property).
 
         >>> add = lambda x, y: x + y
         >>> add_ = symbol(add)
@@ -147,12 +443,7 @@ class symbol:
         >>> 123 in add_(123)
         True
         """
-        for parameter in (
-            self.parameters.values() # pylint: disable=no-member
-            if isinstance(self.parameters, dict) else
-            self.parameters
-        ):
-            yield parameter
+        return iter(self.parameters)
 
     def __len__(self: symbol) -> int:
         """
@@ -166,12 +457,27 @@ class symbol:
         >>> len(e)
         2
         """
-        return len(self.parameters) if self.parameters is not None else 0
+        return len(self.parameters)
 
-    def evaluate(self: symbol) -> Any:
+    @property
+    def kwargs(self: symbol) -> dict:
         """
-        Evaluate a symbolic expression (via recursive evaluation of all
-        subexpressions) and return the result.
+        Dictionary that maps each keyword (if this instance was created via
+        application to keyword arguments) to its corresponding parameter.
+
+        >>> add = lambda x, y: x + y
+        >>> e = symbol(add)(x=symbol(1), y=symbol(2))
+        >>> {k: p.instance for (k, p) in e.kwargs.items()}
+        {'x': 1, 'y': 2}
+        >>> symbol(add)(symbol(1), symbol(2)).kwargs
+        {}
+        """
+        return {} if self._kwnames is None else dict(zip(self._kwnames, self.parameters))
+
+    def evaluate(self: symbol, cache: Optional[dict] = None) -> Any:
+        """
+        Evaluate a symbolic expression (via evaluation of all subexpressions
+        in post-order) and return the result.
 
         >>> add = lambda x, y: x + y
         >>> e = symbol(add)(symbol(1), symbol(2))
@@ -180,18 +486,1132 @@ class symbol:
         >>> e = symbol(list.__getitem__)(symbol(['a', 'b', 'c']), symbol(1))
         >>> e.evaluate()
         'b'
+        >>> symbol(lambda x, y, z: x + y + z)(symbol(1), symbol(2), symbol(3)).evaluate()
+        6
+        >>> symbol(list)().evaluate()
+        []
+
+        Subexpressions beyond a fixed depth are evaluated without relying on
+        recursion, so the depth of an expression is not limited by the Python
+        interpreter's recursion limit.
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> e = symbol(0)
+        >>> for _ in range(10000):
+        ...     e = inc(e)
+        >>> e.evaluate()
+        10000
+
+        A subexpression that appears more than once within an expression is
+        evaluated only once.
+
+        >>> calls = []
+        >>> def inc(x):
+        ...     calls.append(x)
+        ...     return x + 1
+        >>> x = symbol(inc)(symbol(1))
+        >>> (x + x).evaluate()
+        4
+        >>> len(calls)
+        1
+
+        If this instance has been compiled using :obj:`compile`, the compiled
+        program is used to evaluate the expression.
+
+        >>> e = symbol(inc)(symbol(1)) * symbol(inc)(symbol(2))
+        >>> _ = e.compile()
+        >>> e.evaluate()
+        6
+
+        Applications of :obj:`and_` and :obj:`or_` are short-circuited (*i.e.*,
+        the second parameter is evaluated only if necessary).
+
+        >>> calls.clear()
+        >>> and_(symbol(inc)(symbol(-1)), symbol(inc)(symbol(1))).evaluate()
+        0
+        >>> calls
+        [-1]
+        >>> or_(symbol(inc)(symbol(-1)), symbol(inc)(symbol(1))).evaluate()
+        2
+        >>> calls
+        [-1, -1, 1]
+
+        A dictionary can be supplied in which the results of subexpressions are
+        stored (keyed by the identifiers of their :obj:`symbol` instances). The
+        dictionary can be reused across invocations, in which case all results
+        stored within it are reused. The dictionary also holds a reference to
+        each of the subexpressions (so that their identifiers cannot be reused
+        by other objects). A dictionary should only be reused if the instances
+        within the expressions are pure functions.
+
+        >>> cache = {}
+        >>> calls.clear()
+        >>> (x * x).evaluate(cache)
+        4
+        >>> (x - x).evaluate(cache)
+        0
+        >>> calls
+        [1]
         """
-        if self.parameters is None:
+        memo = self._memo
+        if memo is not None:
+            if 'value' in memo:
+                return memo['value']
+            if 'results' in memo and cache is None:
+                cache = memo['results'] # Stored by :obj:`evaluate_cached`.
+            elif 'program' in memo and cache is None:
+                return self.run()
+
+        if self._leaf:
             return self.instance
 
-        return self.instance(*[
-            parameter.evaluate()
-            for parameter in (
-                self.parameters.values() # pylint: disable=no-member
-                if isinstance(self.parameters, dict) else
-                self.parameters
-            )
-        ])
+        if cache is None:
+            return self._evaluate_recursive({}, _RECURSION_DEPTH)
+
+        return self._evaluate_iterative(cache)
+
+    def _evaluate_recursive(self: symbol, cache: dict, depth: int) -> Any:
+        """
+        Evaluate a symbolic expression recursively (used by :obj:`evaluate`).
+        Only the results of subexpressions that are parameters of more than one
+        application are stored in the supplied cache, and subexpressions that
+        are beyond the supplied depth are evaluated using
+        :obj:`_evaluate_iterative`.
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> x = inc(symbol(1))
+        >>> cache = {}
+        >>> (x + inc(x))._evaluate_recursive(cache, 10)
+        5
+        >>> [node is x for (node, _) in cache.values()]
+        [True]
+        >>> inc(inc(inc(symbol(1))))._evaluate_recursive({}, 1)
+        4
+        >>> or_(symbol(0), and_(x, symbol(3)))._evaluate_recursive({}, 10)
+        3
+        """
+        # Leaves are never passed to this method (their instances are read
+        # directly by the caller). Only the results of constant applications
+        # (which are stored on the nodes) and of shared applications (which
+        # are stored in the cache) are looked up and stored.
+        stored = self._constant or self._uses > 1
+        if stored:
+            if self._memo is not None and 'value' in self._memo:
+                return self._memo['value']
+            if id(self) in cache:
+                return cache[id(self)][1]
+
+        if depth == 0:
+            return self._evaluate_iterative(cache)
+
+        depth -= 1
+        parameters = self.parameters
+        instance = self.instance
+        if (instance is _and_ or instance is _or_) and len(parameters) == 2:
+            (left, right) = parameters
+            result = left.instance if left._leaf else left._evaluate_recursive(cache, depth)
+            if bool(result) == (instance is _and_):
+                result = right.instance if right._leaf else right._evaluate_recursive(cache, depth)
+        else:
+            result = self._function(*[
+                p.instance if p._leaf else p._evaluate_recursive(cache, depth)
+                for p in parameters
+            ])
+
+        if stored:
+            if self._constant:
+                self._remember('value', result)
+            else:
+                cache[id(self)] = (self, result)
+        return result
+
+    def _evaluate_iterative( # pylint: disable=too-many-locals,too-many-branches
+            self: symbol,
+            cache: dict
+        ) -> Any:
+        """
+        Evaluate a symbolic expression without relying on recursion (used by
+        :obj:`evaluate`), and store the results of all of its applications in
+        the supplied cache.
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> cache = {}
+        >>> inc(inc(symbol(1)))._evaluate_iterative(cache)
+        3
+        >>> sorted(result for (_, result) in cache.values())
+        [2, 3]
+        >>> x = inc(symbol(1))
+        >>> and_(x, or_(symbol(0), x + x))._evaluate_iterative({})
+        4
+        >>> symbol(lambda *xs: sum(xs))(symbol(1), x, symbol(3))._evaluate_iterative({})
+        6
+
+        The results of short-circuited applications are also stored, so shared
+        applications of :obj:`and_` and :obj:`or_` are evaluated only once.
+
+        >>> (a, o) = (and_(x, inc(symbol(2))), or_(x, inc(symbol(3))))
+        >>> cache = {}
+        >>> ((a + a)._evaluate_iterative(cache), (o * o)._evaluate_iterative(cache))
+        (6, 4)
+        >>> (cache[id(a)][1], cache[id(o)][1])
+        (3, 2)
+        """
+        # Each entry in the work stack indicates whether none (``0``), all
+        # (``1``), or only the second (``2``, for short-circuited applications)
+        # of the parameters of the node have already been scheduled for
+        # evaluation. The results of all completed applications are kept on a
+        # separate value stack and in a cache that is keyed by node identity.
+        # Leaf parameters are never scheduled (their values are read directly
+        # when they are needed) unless they are short-circuited.
+        work = [(self, 0)]
+        values = []
+        cache = {} if cache is None else cache
+        (schedule, push, pop) = (work.append, values.append, values.pop)
+        while len(work) > 0:
+            (node, visited) = work.pop()
+            parameters = node.parameters
+            instance = node.instance
+            if visited:
+                # The value of the first parameter of a short-circuited
+                # application is the result unless the second parameter must be
+                # evaluated (in which case the value of the second parameter is
+                # the result).
+                arity = len(parameters)
+                short = (instance is _and_ or instance is _or_) and arity == 2
+                if short and visited == 1 and bool(values[-1]) == (instance is _and_):
+                    pop()
+                    schedule((node, 2))
+                    schedule((parameters[1], 0))
+                    continue
+
+                # Unary and binary applications (which include all of the
+                # pre-defined operators) avoid building an argument list. The
+                # pre-defined operators are applied using built-in functions.
+                instance = node._function
+                if short:
+                    result = pop()
+                elif arity == 2:
+                    (left, right) = parameters
+                    right = right.instance if right._leaf else pop()
+                    result = instance(left.instance if left._leaf else pop(), right)
+                elif arity == 1:
+                    result = instance(
+                        parameters[0].instance if parameters[0]._leaf else pop()
+                    )
+                else:
+                    arguments = [p.instance if p._leaf else None for p in parameters]
+                    for index in range(arity - 1, -1, -1):
+                        if not parameters[index]._leaf:
+                            arguments[index] = pop()
+                    result = instance(*arguments)
+                cache[id(node)] = (node, result)
+                if node._constant:
+                    node._remember('value', result)
+                push(result)
+            elif node._leaf:
+                push(instance)
+            elif node._memo is not None and 'value' in node._memo:
+                push(node._memo['value'])
+            elif id(node) in cache:
+                push(cache[id(node)][1])
+            else:
+                schedule((node, 1))
+                if (instance is _and_ or instance is _or_) and len(parameters) == 2:
+                    schedule((parameters[0], 0))
+                else:
+                    work.extend((p, 0) for p in reversed(parameters) if not p._leaf)
+
+        return values[0]
+
+    def evaluate_cached(self: symbol) -> Any:
+        """
+        Evaluate a symbolic expression, store the results of all of its
+        subexpressions within this instance, and return the result. The stored
+        results are used by all subsequent invocations of this method (and of
+        :obj:`evaluate`) on this instance until they are discarded using
+        :obj:`invalidate`. This method should only be used if the instances
+        within the expression are pure functions.
+
+        >>> calls = []
+        >>> def inc(x):
+        ...     calls.append(x)
+        ...     return x + 1
+        >>> e = symbol(inc)(symbol(1))
+        >>> (e.evaluate_cached(), e.evaluate_cached(), e.evaluate())
+        (2, 2, 2)
+        >>> calls
+        [1]
+        >>> e.invalidate()
+        >>> e.evaluate()
+        2
+        >>> calls
+        [1, 1]
+
+        The stored results belong to this instance, so they are not used when
+        a subexpression or another expression that contains this instance is
+        evaluated.
+
+        >>> calls.clear()
+        >>> e.evaluate_cached()
+        2
+        >>> ((e * symbol(3)).evaluate(), symbol(inc)(e).evaluate_cached())
+        (6, 3)
+        >>> calls
+        [1, 1, 1, 2]
+        """
+        if self._memo is None or 'results' not in self._memo:
+            self._remember('results', {})
+
+        return self.evaluate(self._memo['results'])
+
+    def invalidate(self: symbol):
+        """
+        Discard the values of this instance and of all of its subexpressions
+        that have been stored by :obj:`evaluate` or :obj:`evaluate_cached`.
+
+        An expression is *constant* if it consists only of leaf instances that
+        have immutable values (see :obj:`_immutable`) and applications of the
+        pre-defined operators. When such an expression is evaluated, its value
+        is stored within the instance and that value is returned by subsequent
+        invocations of :obj:`evaluate`. Most such expressions are computed when
+        they are created (see :obj:`__call__`), so this only applies if folding
+        is disabled or fails.
+
+        >>> previous = set_fold(False)
+        >>> try:
+        ...     e = symbol(2) + symbol(3)
+        ... finally:
+        ...     _ = set_fold(previous)
+        >>> (e.evaluate(), e._memo['value'])
+        (5, 5)
+        >>> e.invalidate()
+        >>> 'value' in e._memo
+        False
+
+        Evaluation results are never stored for other expressions (including
+        those that have leaf instances with mutable values).
+
+        >>> x = [3]
+        >>> e = add_(x=symbol(x), y=symbol([4]))
+        >>> e.evaluate()
+        [3, 4]
+        >>> x.append(5)
+        >>> e.evaluate()
+        [3, 5, 4]
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> e = inc(symbol(1)) + inc(symbol(2))
+        >>> e.evaluate()
+        5
+        >>> e._memo is None
+        True
+        """
+        for node in _postorder(self):
+            if node._memo is not None:
+                node._memo.pop('value', None)
+                node._memo.pop('results', None)
+
+    def _remember(self: symbol, name: str, value: Any) -> Any:
+        """
+        Store a value under the supplied name within this instance and return
+        it. Values that are stored by methods (such as the result of a constant
+        expression, the program produced by :obj:`compile`, the functions
+        produced by :obj:`njit`, or the key produced by :obj:`struct_key`) are
+        kept in a dictionary that is only created once a value is stored, so
+        nodes for which no value is stored need only a single slot for them.
+
+        >>> x = symbol([1])
+        >>> x._memo is None
+        True
+        >>> x._remember('key', 123)
+        123
+        >>> x._memo
+        {'key': 123}
+        """
+        if self._memo is None:
+            self._memo = {}
+        self._memo[name] = value
+        return value
+
+    def specialize(self: symbol, bindings: dict) -> symbol:
+        """
+        Return an equivalent symbolic expression in which the leaf instances
+        that appear in the supplied dictionary are replaced by leaf instances
+        that have the corresponding values, and in which every application of
+        a pre-defined operator to such leaf instances (or to the results of
+        such computations) is computed. Other leaf instances are left unchanged.
+
+        >>> import numpy as np
+        >>> (x, y) = (symbol(np.zeros(0)), symbol(np.zeros(0)))
+        >>> inc = symbol(lambda v: v + 1)
+        >>> e = inc(x * (y + symbol(2)))
+        >>> s = e.specialize({y: 3})
+        >>> (len(s.parameters[0]), s.parameters[0].parameters[1].instance)
+        (2, 5)
+        >>> s.specialize({x: 4}).evaluate()
+        21
+
+        Unlike the computations performed when expressions are created (see
+        :obj:`__call__`), the values of the leaf instances can be of any type.
+
+        >>> (y + y).specialize({y: [2]}).instance
+        [2, 2]
+
+        Applications whose computation fails are left unchanged (so that the
+        exception is raised if the expression is evaluated).
+
+        >>> s = (y + y).specialize({y: {2}})
+        >>> (s._leaf, s.parameters[0].instance)
+        (False, {2})
+
+        Every key must be a leaf instance that occurs within the expression.
+
+        >>> (y + y).specialize({x: 2})
+        Traceback (most recent call last):
+          ...
+        ValueError: keys must be leaf instances within the expression
+
+        No applications are computed if folding is disabled (see
+        :obj:`set_fold`).
+
+        >>> previous = set_fold(False)
+        >>> try:
+        ...     s = (y + y).specialize({y: [2]})
+        ... finally:
+        ...     _ = set_fold(previous)
+        >>> (s._leaf, s.evaluate())
+        (False, [2, 2])
+        """
+        if not _occur(self, bindings):
+            raise ValueError('keys must be leaf instances within the expression')
+
+        bindings = {id(leaf): value for (leaf, value) in bindings.items()}
+        nodes = {} # Specialized node for each node that has been processed.
+        frozen = set() # Nodes that are (or have been computed from) bound leaves.
+        for node in _postorder(self):
+            if node._leaf:
+                nodes[id(node)] = node
+                if id(node) in bindings:
+                    nodes[id(node)] = symbol(bindings[id(node)])
+                    frozen.add(id(node))
+            else:
+                parameters = tuple(
+                    nodes[id(p)] if isinstance(p, symbol) else p
+                    for p in node.parameters
+                )
+                # Applications to immutable leaves are already computed by
+                # :obj:`_apply`, so only those that involve bound leaves that
+                # have mutable values are computed explicitly.
+                nodes[id(node)] = node._apply(parameters, node._kwnames)
+                if (
+                    SYMBOLISM_FOLD and id(node.instance) in _pure and node._kwnames is None and
+                    any(
+                        id(p) in frozen and not nodes[id(p)]._constant
+                        for p in node.parameters if isinstance(p, symbol)
+                    ) and
+                    all(
+                        isinstance(p, symbol) and nodes[id(p)]._leaf and
+                        (id(p) in frozen or nodes[id(p)]._constant)
+                        for p in node.parameters
+                    )
+                ):
+                    try:
+                        nodes[id(node)] = symbol(node.instance(*[p.instance for p in parameters]))
+                        frozen.add(id(node))
+                    except Exception: # pylint: disable=broad-except
+                        pass
+
+        return nodes[id(self)]
+
+    def struct_key(self: symbol) -> tuple:
+        """
+        Return a hashable value that represents the structure of the symbolic
+        expression. Expressions that are structurally identical (*i.e.*, that
+        consist of applications of the same instances to structurally identical
+        parameters) have equal keys. The key is computed once and stored within
+        this instance (and within each of its subexpressions).
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> inc(symbol((1, 2))).struct_key() == inc(symbol((1, 2))).struct_key()
+        True
+        >>> inc(symbol((1, 2))).struct_key() == inc(symbol((1, 3))).struct_key()
+        False
+
+        The values of leaf instances (together with their types, and with the
+        types of the items within any tuples or frozen sets) are part of the key
+        if they are hashable (and leaf instances that refer to the same
+        unhashable value have equal keys).
+
+        >>> inc(symbol((1,))).struct_key() == inc(symbol((True,))).struct_key()
+        False
+        >>> inc(symbol((0.0,))).struct_key() == inc(symbol((-0.0,))).struct_key()
+        False
+
+        >>> x = [1]
+        >>> symbol(x).struct_key() == symbol(x).struct_key()
+        True
+        >>> symbol(x).struct_key() == symbol([1]).struct_key()
+        False
+        """
+        for node in _postorder(self, lambda node: node._memo is not None and 'key' in node._memo):
+            if node._leaf:
+                key = (None,) + _leaf_key(node.instance)
+                try:
+                    hash(key)
+                except TypeError:
+                    key = (None, id(node.instance))
+                node._remember('key', key)
+            else:
+                node._remember('key', (
+                    id(node.instance), node._kwnames,
+                    tuple(
+                        p._memo['key'] if isinstance(p, symbol) else id(p)
+                        for p in node.parameters
+                    )
+                ))
+
+        return self._memo['key']
+
+    def cse(self: symbol) -> symbol:
+        """
+        Return an equivalent symbolic expression in which all structurally
+        identical subexpressions are represented by the same :obj:`symbol`
+        instance (so that each is computed only once by :obj:`evaluate`).
+
+        >>> calls = []
+        >>> def inc(x):
+        ...     calls.append(x)
+        ...     return x + 1
+        >>> e = symbol(inc)(symbol(1)) * symbol(inc)(symbol(1))
+        >>> e.parameters[0] is e.parameters[1]
+        False
+        >>> c = e.cse()
+        >>> c.parameters[0] is c.parameters[1]
+        True
+        >>> (c.evaluate(), calls)
+        (4, [1])
+
+        Applications of all instances (not only of the pre-defined operators)
+        are merged, so this method should only be used if the instances within
+        the expression are pure functions.
+
+        Leaf instances are merged only if their instances are hashable and are
+        equal and of the same type (as are the items within any tuples or frozen
+        sets). Floating-point zeros of opposite signs are not merged.
+
+        >>> e = symbol(inc)(symbol(1)) + symbol(inc)(symbol(True))
+        >>> c = e.cse()
+        >>> c.parameters[0] is c.parameters[1]
+        False
+        >>> e = symbol(inc)(symbol(0.0)) + symbol(inc)(symbol(-0.0))
+        >>> c = e.cse()
+        >>> c.parameters[0] is c.parameters[1]
+        False
+        >>> e = symbol(inc)(symbol([1])) + symbol(inc)(symbol([1]))
+        >>> c = e.cse()
+        >>> c.parameters[0] is c.parameters[1]
+        False
+        >>> e = symbol(repr)(symbol((0.0,))) + symbol(repr)(symbol((-0.0,)))
+        >>> e.cse().evaluate()
+        '(0.0,)(-0.0,)'
+        >>> e = symbol(repr)(symbol((1,))) + symbol(repr)(symbol((True,)))
+        >>> e.cse().evaluate()
+        '(1,)(True,)'
+        """
+        leaves = {} # Canonical leaf node for each structural key.
+        applications = {} # Canonical node for each application of an instance.
+        nodes = {} # Canonical node for each node that has been processed.
+        for node in _postorder(self):
+            if node._leaf:
+                nodes[id(node)] = leaves.setdefault(node.struct_key(), node)
+            else:
+                parameters = tuple(
+                    nodes[id(p)] if isinstance(p, symbol) else p
+                    for p in node.parameters
+                )
+                key = (id(node.instance), node._kwnames, tuple(id(p) for p in parameters))
+                if key not in applications:
+                    applications[key] = (
+                        node
+                        if all(p is q for (p, q) in zip(parameters, node.parameters)) else
+                        node._apply(parameters, node._kwnames)
+                    )
+                nodes[id(node)] = applications[key]
+
+        return nodes[id(self)]
+
+    def compile(self: symbol) -> list:
+        """
+        Convert the symbolic expression into an equivalent flat program (a list
+        of instructions in post-order) for a stack machine, store it within
+        this instance, and return it. Subsequent invocations of :obj:`evaluate`
+        execute the stored program using :obj:`run`.
+
+        >>> add = symbol(lambda x, y: x + y)
+        >>> e = add(add(symbol(1), symbol(2)), symbol(3))
+        >>> len(e.compile())
+        5
+        >>> e.run()
+        6
+
+        A subexpression that appears more than once within an expression is
+        computed only once by the program. Its result is stored and then loaded
+        wherever it is referenced again.
+
+        >>> x = add(symbol(1), symbol(2))
+        >>> e = add(x, x)
+        >>> len(e.compile())
+        5
+        >>> e.run()
+        6
+
+        Applications of :obj:`and_` and :obj:`or_` are compiled into conditional
+        jumps (so the second parameter is evaluated only if necessary). The
+        result of a subexpression that is computed only conditionally is not
+        loaded outside of the conditional jump (the instructions for it appear
+        again instead).
+
+        >>> e = add(or_(symbol(1) - symbol(1), x), x)
+        >>> len(e.compile())
+        9
+        >>> e.run()
+        6
+
+        Chains of applications of an operator that accepts any number of
+        parameters are compiled into a single instruction (see :obj:`_operands`).
+
+        >>> e = symbol([1]) + symbol([2]) + symbol([3])
+        >>> (len(e.compile()), e.run())
+        (4, [1, 2, 3])
+
+        Because expressions are not modified after they are created, the stored
+        program never needs to be invalidated.
+        """
+        program = []
+        positions = {} # Position of the instruction for each non-leaf node.
+        emitted = [] # Non-leaf nodes in the order of their instructions.
+        jumps = [] # Conditional jumps (and nodes emitted before them) to patch.
+        work = [(self, False)]
+        while len(work) > 0:
+            (node, visited) = work.pop()
+            if visited is None:
+                # Complete a conditional jump by setting its target. Nodes that
+                # were emitted after the jump may never be computed, so their
+                # results cannot be loaded by instructions outside of the jump.
+                (position, count) = jumps.pop()
+                program[position] = (program[position][0], len(program))
+                for node_id in emitted[count:]:
+                    del positions[node_id]
+                del emitted[count:]
+            elif node._leaf:
+                program.append((_LEAF, node.instance))
+            elif id(node) in positions:
+                # Mark the earlier instruction so that it stores its result
+                # (using its own position as the register).
+                position = positions[id(node)]
+                (opcode, instance, arity, _) = program[position]
+                program[position] = (opcode, instance, arity, position)
+                program.append((_LOAD, position))
+            elif not visited:
+                work.append((node, True))
+                if _short_circuits(node):
+                    work.append((node.parameters[0], False))
+                else:
+                    work.extend((parameter, False) for parameter in reversed(_operands(node)))
+            elif _short_circuits(node):
+                jumps.append((len(program), len(emitted)))
+                program.append((
+                    _JUMP_IF_FALSE_OR_POP if node.instance is _and_ else _JUMP_IF_TRUE_OR_POP,
+                    None
+                ))
+                work.append((node, None))
+                work.append((node.parameters[1], False))
+            else:
+                positions[id(node)] = len(program)
+                emitted.append(id(node))
+                arity = len(_operands(node))
+                program.append((
+                    _CALL,
+                    node._function if arity == len(node.parameters) else node.instance,
+                    arity,
+                    None
+                ))
+
+        self._remember('program', program)
+        return program
+
+    def run(self: symbol) -> Any: # pylint: disable=too-many-branches
+        """
+        Execute the program produced by :obj:`compile` for this instance (first
+        compiling it if necessary) and return the result.
+
+        >>> e = symbol(lambda x, y: x - y)(symbol(5), symbol(3))
+        >>> e.run()
+        2
+        >>> symbol(5).run()
+        5
+
+        Applications of :obj:`and_` and :obj:`or_` evaluate their second
+        parameter only if the value of the first parameter does not determine
+        the result, and other applications can have any number of parameters.
+
+        >>> (a, b, c) = (symbol([]), symbol([1]), symbol([2]))
+        >>> [and_(b, c).run(), and_(a, c).run(), or_(b, c).run(), or_(a, c).run()]
+        [[2], [], [1], [2]]
+        >>> symbol(lambda *xs: sum(xs))(symbol(1), symbol(2), symbol(3)).run()
+        6
+        """
+        program = (
+            self._memo['program']
+            if self._memo is not None and 'program' in self._memo else
+            self.compile()
+        )
+        stack = []
+        registers = {}
+        (push, pop) = (stack.append, stack.pop)
+        position = 0
+        while position < len(program):
+            instruction = program[position]
+            position += 1
+            opcode = instruction[0]
+            if opcode == _LEAF:
+                push(instruction[1])
+            elif opcode == _LOAD:
+                push(registers[instruction[1]])
+            elif opcode == _JUMP_IF_FALSE_OR_POP:
+                if not stack[-1]:
+                    position = instruction[1]
+                else:
+                    pop()
+            elif opcode == _JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    position = instruction[1]
+                else:
+                    pop()
+            else:
+                (_, instance, arity, register) = instruction
+                if arity == 2:
+                    right = pop()
+                    result = instance(pop(), right)
+                elif arity == 1:
+                    result = instance(pop())
+                else:
+                    arguments = stack[len(stack) - arity:]
+                    del stack[len(stack) - arity:]
+                    result = instance(*arguments)
+                if register is not None:
+                    registers[register] = result
+                push(result)
+
+        return stack[0]
+
+    def compile_flat(self: symbol) -> compiled:
+        """
+        Convert the symbolic expression into an equivalent :obj:`compiled`
+        instance, in which every distinct application and every occurrence of a
+        leaf instance is represented by an entry within each of three parallel
+        lists.
+
+        >>> add = symbol(lambda x, y: x + y)
+        >>> x = add(symbol(1), symbol(2))
+        >>> c = add(x, x).compile_flat()
+        >>> len(c.operations)
+        4
+        >>> c()
+        6
+        >>> y = symbol([1])
+        >>> (y + y).compile_flat().indices
+        [(), (), (0, 1)]
+        """
+        operations = []
+        indices = []
+        constants = []
+        positions = {} # Index of the entry for each application.
+        for node in _postorder(self, lambda node: node._leaf and node is not self):
+            # Each occurrence of a leaf instance has its own entry.
+            entries = []
+            for p in node.parameters if not node._leaf else (node,):
+                if p._leaf:
+                    entries.append(len(operations))
+                    operations.append(None)
+                    indices.append(())
+                    constants.append(p.instance)
+                else:
+                    entries.append(positions[id(p)])
+
+            if not node._leaf:
+                positions[id(node)] = len(operations)
+                operations.append(node._function)
+                indices.append(tuple(entries))
+                constants.append(None)
+
+        return compiled(operations, indices, constants)
+
+    def njit(self: symbol, *variables: symbol) -> Callable[..., Any]:
+        """
+        Generate the source code of a Python function in which each pre-defined
+        operator is represented using the Python operator to which it
+        corresponds, and return that function. The result is stored within this
+        instance and returned by subsequent invocations (with the same
+        arguments).
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> e = (symbol(2) - inc(symbol(3))) * inc(symbol(4))
+        >>> f = e.njit()
+        >>> f()
+        -10
+        >>> f is e.njit()
+        True
+        >>> (inc(symbol(1)) + inc(symbol(2)) + inc(symbol(3))).njit()()
+        9
+
+        Leaf instances can be supplied as arguments, in which case the function
+        takes one parameter for each of them and these parameters are used in
+        place of the values of those leaf instances. Because applications of the
+        pre-defined operators to leaf instances that have immutable values are
+        computed when they are created (see :obj:`__call__`), such leaf
+        instances should have values of other types (such as arrays).
+
+        >>> import numpy as np
+        >>> (x, y) = (symbol(np.zeros(2)), symbol(np.zeros(2)))
+        >>> e = (x + y) * inc(x)
+        >>> f = e.njit(x, y)
+        >>> f(2, 3)
+        15
+        >>> f is e.njit(x, y)
+        True
+        >>> (x + y).njit(x + y)
+        Traceback (most recent call last):
+          ...
+        ValueError: arguments must be leaf instances
+
+        Every argument must occur within the expression. Applications to leaf
+        instances that have immutable values are computed when they are
+        created (see :obj:`__call__`), so such leaf instances may not occur.
+
+        >>> (x, y) = (symbol(1.0), symbol(2.0))
+        >>> (x * x + y).njit(x, y)
+        Traceback (most recent call last):
+          ...
+        ValueError: arguments must occur within the expression
+
+        Note that both parameters of any application of :obj:`and_` or :obj:`or_`
+        are evaluated by the generated function.
+
+        If every function within the expression is a pre-defined operator and
+        the `Numba <https://numba.pydata.org>`__ library is installed, the
+        function is compiled using ``numba.njit``. The types of the parameters
+        for which the function is compiled are those of the values of the leaf
+        instances that are supplied as arguments. If Numba is not installed or
+        fails to compile the function, the Python function is returned.
+        """
+        return self._memoized(tuple(id(variable) for variable in variables), variables, self._njit)
+
+    def _memoized(
+            self: symbol,
+            key: tuple,
+            variables: tuple,
+            build: Callable[[tuple], Callable[..., Any]]
+        ) -> Callable[..., Any]:
+        """
+        Return the function stored within this instance under the supplied key
+        or, if there is none, build it from the supplied leaf instances, store
+        it, and return it (used by :obj:`njit` and :obj:`jit_llvm`).
+
+        >>> e = symbol(2) * symbol([3])
+        >>> f = e._memoized(('test',), (), lambda variables: len)
+        >>> f is e._memoized(('test',), (), lambda variables: abs)
+        True
+        """
+        functions = {} if self._memo is None else self._memo.get('jit', {})
+        if key in functions:
+            return functions[key][1]
+
+        if not all(isinstance(variable, symbol) and variable._leaf for variable in variables):
+            raise ValueError('arguments must be leaf instances')
+
+        # A variable that does not occur (for example, because the applications
+        # to it have been folded) would otherwise be silently ignored.
+        if not _occur(self, variables):
+            raise ValueError('arguments must occur within the expression')
+
+        function = build(variables)
+
+        # The variables are stored so that their identifiers remain valid keys.
+        functions[key] = (variables, function)
+        self._remember('jit', functions)
+        return function
+
+    def _njit(self: symbol, variables: tuple) -> Callable[..., Any]:
+        """
+        Generate the function returned by :obj:`njit` for the supplied leaf
+        instances.
+        """
+        # Each leaf value and each function that has no corresponding operator
+        # is bound to a name within the namespace of the generated function.
+        namespace = {}
+        names = { # Name of the variable that holds the value of each node.
+            id(variable): 'a' + str(i) for (i, variable) in enumerate(variables)
+        }
+        lines = []
+        compilable = True
+        for node in _postorder(self, lambda node: id(node) in names, True):
+            if node._leaf:
+                names[id(node)] = 'c' + str(len(namespace))
+                namespace[names[id(node)]] = node.instance
+            else:
+                arguments = [names[id(parameter)] for parameter in _operands(node)]
+                template = _templates.get(id(node.instance))
+                if template is not None and template.count('{') == len(arguments):
+                    expression = template.format(*arguments)
+                elif id(node.instance) in _chains and len(arguments) > 2:
+                    # Apply the binary operator from left to right.
+                    expression = template.format(*arguments[:2])
+                    for argument in arguments[2:]:
+                        lines.append('    t' + str(len(lines)) + ' = ' + expression + '\n')
+                        expression = template.format('t' + str(len(lines) - 1), argument)
+                else:
+                    compilable = False
+                    function = 'f' + str(len(namespace))
+                    namespace[function] = node.instance
+                    expression = function + '(' + ', '.join(arguments) + ')'
+                names[id(node)] = 't' + str(len(lines))
+                lines.append('    ' + names[id(node)] + ' = ' + expression + '\n')
+
+        source = (
+            'def f(' + ', '.join('a' + str(i) for i in range(len(variables))) + '):\n' +
+            ''.join(lines) + '    return ' + names[id(self)] + '\n'
+        )
+        exec(compile(source, '<symbolism>', 'exec'), namespace) # pylint: disable=exec-used
+        function = namespace['f']
+
+        if compilable:
+            try:
+                import numba # pylint: disable=import-outside-toplevel,import-error
+                jitted = numba.njit(function)
+                # Compile eagerly to detect unsupported types.
+                jitted.compile(tuple(numba.typeof(variable.instance) for variable in variables))
+                function = jitted
+            except Exception: # pylint: disable=broad-except
+                pass
+
+        return function
+
+    def jit_llvm(self: symbol, *variables: symbol) -> Callable[..., float]:
+        """
+        Compile the symbolic expression into machine code using the
+        `llvmlite <https://llvmlite.readthedocs.io>`__ library and return a
+        function that executes it. As with :obj:`njit`, leaf instances can be
+        supplied as arguments (in which case the function takes one parameter
+        for each of them). The result is stored within this instance and
+        returned by subsequent invocations (with the same arguments).
+
+        >>> import numpy as np
+        >>> (x, y) = (symbol(np.zeros(())), symbol(np.zeros(())))
+        >>> e = x * x + y / symbol(2.0)
+        >>> f = e.jit_llvm(x, y)
+        >>> f(3.0, 1.0)
+        9.5
+        >>> f is e.jit_llvm(x, y)
+        True
+
+        All values within the compiled function are double-precision
+        floating-point numbers. Only numeric leaf values and applications of
+        :obj:`add_`, :obj:`sub_`, :obj:`mul_`, :obj:`truediv_`, :obj:`pow_`,
+        :obj:`pos_`, and :obj:`neg_` are supported. If llvmlite is not installed,
+        if the expression contains anything else, or if llvmlite fails to
+        compile the expression, the function returned by :obj:`njit` is
+        returned instead.
+
+        >>> f = (symbol(abs)(x) - y).jit_llvm(x, y)
+        >>> f(-3.0, 1.0)
+        2.0
+        >>> (x * symbol(len)(symbol('ab'))).jit_llvm(x)(3.0)
+        6.0
+        >>> (-(x ** y) + +x).jit_llvm(x, y)(2.0, 3.0)
+        -6.0
+        >>> (-x).jit_llvm(x)(0.0)
+        -0.0
+
+        As with :obj:`njit`, every argument must occur within the expression.
+
+        >>> (x, y) = (symbol(1.0), symbol(2.0))
+        >>> (x * x + y).jit_llvm(x, y)
+        Traceback (most recent call last):
+          ...
+        ValueError: arguments must occur within the expression
+        """
+        def build(variables: tuple) -> Callable[..., Any]:
+            try:
+                return _llvm(self, variables)
+            except Exception: # pylint: disable=broad-except
+                return self.njit(*variables)
+
+        return self._memoized(
+            ('llvm',) + tuple(id(variable) for variable in variables), variables, build
+        )
+
+    def evaluate_numpy(self: symbol, out: Any = None) -> Any:
+        """
+        Evaluate a symbolic expression in which values may be
+        `NumPy <https://numpy.org>`__ arrays. Each pre-defined operator is
+        applied using the corresponding NumPy function (so that it is applied
+        element-wise), and any other instance is applied to the values of its
+        parameters directly.
+
+        >>> import numpy as np
+        >>> x = symbol(np.array)(symbol([1, 2, 3]))
+        >>> ((x + x) * symbol(2)).evaluate_numpy()
+        array([ 4,  8, 12])
+        >>> or_(x < symbol(2), x > symbol(2)).evaluate_numpy()
+        array([ True, False,  True])
+
+        An array into which the result should be written can be supplied (in
+        which case it is passed to the NumPy function applied at the root of the
+        expression).
+
+        >>> out = np.zeros(3, dtype=np.int64)
+        >>> (x + x + x).evaluate_numpy(out=out) is out
+        True
+        >>> out
+        array([3, 6, 9])
+        >>> symbol(np.array([1, 1, 1])).evaluate_numpy(out=out)
+        array([1, 1, 1])
+        """
+        return self._evaluate_numpy(out, {}, False)
+
+    def evaluate_batch(self: symbol, bindings: dict) -> Any:
+        """
+        Evaluate a symbolic expression over a batch of inputs using NumPy. The
+        supplied dictionary maps leaf instances to the arrays (or other values)
+        that are used in place of their values. Each pre-defined operator is
+        applied using the corresponding NumPy function, and any other instance
+        is applied element-wise using :obj:`numpy.vectorize`.
+
+        >>> import numpy as np
+        >>> (x, y) = (symbol(np.zeros(0)), symbol(np.zeros(0)))
+        >>> e = symbol(max)(x, y) * (x + y)
+        >>> e.evaluate_batch({x: np.array([1, 2, 3]), y: np.array([3, 2, 1])})
+        array([12,  8, 12])
+
+        Leaf instances that do not appear in the dictionary are evaluated to
+        their own values.
+
+        >>> (x * symbol(np.array([2, 3]))).evaluate_batch({x: np.array([4, 5])})
+        array([ 8, 15])
+
+        Every key must be a leaf instance that occurs within the expression.
+
+        >>> (x + x).evaluate_batch({y: np.array([1])})
+        Traceback (most recent call last):
+          ...
+        ValueError: keys must be leaf instances within the expression
+        """
+        if not _occur(self, bindings):
+            raise ValueError('keys must be leaf instances within the expression')
+
+        return self._evaluate_numpy(
+            None, {id(leaf): value for (leaf, value) in bindings.items()}, True
+        )
+
+    def _evaluate_numpy(
+            self: symbol,
+            out: Any,
+            bindings: dict,
+            vectorize: bool
+        ) -> Any:
+        """
+        Evaluate a symbolic expression using NumPy functions (used by
+        :obj:`evaluate_numpy` and :obj:`evaluate_batch`). The values of the leaf
+        instances whose identifiers appear in the supplied dictionary are
+        replaced, and instances other than the pre-defined operators are
+        applied using :obj:`numpy.vectorize` if requested.
+
+        >>> import numpy as np
+        >>> x = symbol(0)
+        >>> symbol(abs)(x)._evaluate_numpy(None, {id(x): np.array([-1, 1])}, True)
+        array([1, 1])
+        """
+        import numpy # pylint: disable=import-outside-toplevel,import-error
+
+        values = {} # Value of each node that has been evaluated.
+        for node in _postorder(self):
+            if node._leaf:
+                values[id(node)] = bindings.get(id(node), node.instance)
+            else:
+                arity = len(node.parameters)
+                arguments = [values[id(parameter)] for parameter in node.parameters]
+                function = (
+                    getattr(numpy, _ufuncs[id(node.instance)])
+                    if id(node.instance) in _ufuncs else
+                    None
+                )
+                if function is None:
+                    result = (
+                        numpy.vectorize(node.instance)(*arguments)
+                        if vectorize else
+                        node.instance(*arguments)
+                    )
+                else:
+                    # Binary functions are applied from left to right to any
+                    # chain of parameters (see :obj:`_operands`).
+                    keywords = {'out': out} if node is self and out is not None else {}
+                    result = arguments[0]
+                    if arity == 1:
+                        result = function(result, **keywords)
+                    for (index, argument) in enumerate(arguments[1:], 2):
+                        result = function(result, argument, **(keywords if index == arity else {}))
+                values[id(node)] = result
+
+        if out is not None and values[id(self)] is not out:
+            out[...] = values[id(self)]
+            return out
+
+        return values[id(self)]
+
+    def evaluate_async(self: symbol, executor: Executor) -> Future:
+        """
+        Evaluate a symbolic expression by submitting the application of every
+        subexpression to the supplied executor, and return a future for the
+        result. Subexpressions that do not depend on one another can thus be
+        evaluated concurrently (*e.g.*, if their instances release the GIL or
+        perform I/O).
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> inc = symbol(lambda x: x + 1)
+        >>> e = inc(symbol(1)) * inc(symbol(2)) - inc(symbol(3))
+        >>> with ThreadPoolExecutor(max_workers=2) as executor:
+        ...     future = e.evaluate_async(executor)
+        ...     future.result()
+        2
+        >>> with ThreadPoolExecutor() as executor:
+        ...     symbol(1).evaluate_async(executor).result()
+        1
+
+        Each task waits for the results of the tasks for its parameters, and the
+        tasks are submitted in post-order (so a task is never started before the
+        tasks on which it depends). This method should therefore be used with an
+        executor that starts tasks in the order in which they are submitted, such
+        as an instance of :obj:`~concurrent.futures.ThreadPoolExecutor`. As with
+        :obj:`evaluate`, a subexpression that appears more than once is evaluated
+        only once. Applications of :obj:`and_` and :obj:`or_` are not
+        short-circuited.
+        """
+        if self._leaf:
+            return executor.submit(lambda: self.instance)
+
+        # All tasks are submitted by the invoking thread, so the table of
+        # futures requires no synchronization.
+        futures = {}
+        for node in _postorder(self, lambda node: node._leaf):
+            futures[id(node)] = executor.submit(_combine, node.instance, [
+                (None, parameter.instance)
+                if parameter._leaf else
+                (futures[id(parameter)], None)
+                for parameter in node.parameters
+            ])
+
+        return futures[id(self)]
 
     def __add__(self: symbol, other: symbol) -> symbol:
         """
@@ -200,8 +1620,22 @@ class symbol:
         True
         >>> e.evaluate()
         5
+
+        Chains of additions are represented by nested applications (so that
+        subexpressions such as the prefix sums below are shared), and they are
+        only flattened when an expression is compiled (see :obj:`_operands`).
+
+        >>> inc = symbol(lambda x: x + 1)
+        >>> sums = [inc(symbol(0))]
+        >>> for i in range(1, 200):
+        ...     sums.append(sums[-1] + inc(symbol(i)))
+        >>> e = symbol(lambda *xs: max(xs))(*sums)
+        >>> sum(len(node) - 1 for node in _postorder(e) if node.instance is _add_)
+        199
+        >>> (e.evaluate(), e.run())
+        (20100, 20100)
         """
-        return add_(self, other)
+        return add_._apply2(self, other)
 
     def __sub__(self: symbol, other: symbol) -> symbol:
         """
@@ -211,7 +1645,7 @@ class symbol:
         >>> e.evaluate()
         -1
         """
-        return sub_(self, other)
+        return sub_._apply2(self, other)
 
     def __mul__(self: symbol, other: symbol) -> symbol:
         """
@@ -221,7 +1655,7 @@ class symbol:
         >>> e.evaluate()
         6
         """
-        return mul_(self, other)
+        return mul_._apply2(self, other)
 
 
     def __matmul__(self: symbol, other: symbol) -> symbol:
@@ -235,7 +1669,7 @@ class symbol:
         >>> e.evaluate()
         True
         """
-        return matmul_(self, other)
+        return matmul_._apply2(self, other)
 
     def __truediv__(self: symbol, other: symbol) -> symbol:
         """
@@ -245,7 +1679,7 @@ class symbol:
         >>> e.evaluate()
         2.5
         """
-        return div_(self, other)
+        return div_._apply2(self, other)
 
     def __floordiv__(self: symbol, other: symbol) -> symbol:
         """
@@ -255,7 +1689,7 @@ class symbol:
         >>> e.evaluate()
         2
         """
-        return floordiv_(self, other)
+        return floordiv_._apply2(self, other)
 
     def __mod__(self: symbol, other: symbol) -> symbol:
         """
@@ -265,7 +1699,7 @@ class symbol:
         >>> e.evaluate()
         1
         """
-        return mod_(self, other)
+        return mod_._apply2(self, other)
 
     def __pow__(self: symbol, other: symbol) -> symbol:
         """
@@ -275,7 +1709,7 @@ class symbol:
         >>> e.evaluate()
         25
         """
-        return pow_(self, other)
+        return pow_._apply2(self, other)
 
     def __lshift__(self: symbol, other: symbol) -> symbol:
         """
@@ -285,7 +1719,7 @@ class symbol:
         >>> e.evaluate()
         16
         """
-        return lshift_(self, other)
+        return lshift_._apply2(self, other)
 
     def __rshift__(self: symbol, other: symbol) -> symbol:
         """
@@ -295,7 +1729,7 @@ class symbol:
         >>> e.evaluate()
         4
         """
-        return rshift_(self, other)
+        return rshift_._apply2(self, other)
 
     def __and__(self: symbol, other: symbol) -> symbol:
         """
@@ -305,7 +1739,7 @@ class symbol:
         >>> e.evaluate()
         {2}
         """
-        return bitand_(self, other)
+        return bitand_._apply2(self, other)
 
     def __xor__(self: symbol, other: symbol) -> symbol:
         """
@@ -315,7 +1749,7 @@ class symbol:
         >>> e.evaluate()
         {1, 3}
         """
-        return bitxor_(self, other)
+        return bitxor_._apply2(self, other)
 
     def __or__(self: symbol, other: symbol) -> symbol:
         """
@@ -325,7 +1759,7 @@ class symbol:
         >>> e.evaluate()
         {1, 2, 3}
         """
-        return bitor_(self, other)
+        return bitor_._apply2(self, other)
 
     def __neg__(self: symbol) -> symbol:
         """
@@ -335,7 +1769,7 @@ class symbol:
         >>> e.evaluate()
         -2
         """
-        return neg_(self)
+        return neg_._apply((self,))
 
     def __pos__(self: symbol) -> symbol:
         """
@@ -345,7 +1779,7 @@ class symbol:
         >>> e.evaluate()
         2
         """
-        return pos_(self)
+        return pos_._apply((self,))
 
     def __invert__(self: symbol) -> symbol:
         """
@@ -355,7 +1789,7 @@ class symbol:
         >>> e.evaluate()
         -3
         """
-        return invert_(self)
+        return invert_._apply((self,))
 
     def __eq__(self: symbol, other: symbol) -> symbol:
         """
@@ -365,7 +1799,7 @@ class symbol:
         >>> e.evaluate()
         False
         """
-        return eq_(self, other)
+        return eq_._apply2(self, other)
 
     def __ne__(self: symbol, other: symbol) -> symbol:
         """
@@ -375,7 +1809,7 @@ class symbol:
         >>> e.evaluate()
         True
         """
-        return ne_(self, other)
+        return ne_._apply2(self, other)
 
     def __lt__(self: symbol, other: symbol) -> symbol:
         """
@@ -385,7 +1819,7 @@ class symbol:
         >>> e.evaluate()
         True
         """
-        return lt_(self, other)
+        return lt_._apply2(self, other)
 
     def __le__(self: symbol, other: symbol) -> symbol:
         """
@@ -395,7 +1829,7 @@ class symbol:
         >>> e.evaluate()
         True
         """
-        return le_(self, other)
+        return le_._apply2(self, other)
 
     def __gt__(self: symbol, other: symbol) -> symbol:
         """
@@ -405,7 +1839,7 @@ class symbol:
         >>> e.evaluate()
         False
         """
-        return gt_(self, other)
+        return gt_._apply2(self, other)
 
     def __ge__(self: symbol, other: symbol) -> symbol:
         """
@@ -415,7 +1849,7 @@ class symbol:
         >>> e.evaluate()
         False
         """
-        return ge_(self, other)
+        return ge_._apply2(self, other)
 
 # In order to accommodate the limitations of measuring coverage of unit tests,
 # the @symbol decorator is not used in the definitions below.
@@ -488,16 +1922,7 @@ in_ = symbol(_in_)
 Symbolic function corresponding to the infix operator |in|_.
 """
 
-def _is_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(is_(symbol(2), symbol(2)), symbol)
-    True
-    >>> is_.instance(2, 2)
-    True
-    """
-    return x is y
-
-is_ = symbol(_is_)
+is_ = symbol(operator.is_)
 """
 .. |is| replace:: ``is``
 .. _is: https://docs.python.org/3/reference/expressions.html#comparisons
@@ -505,140 +1930,80 @@ is_ = symbol(_is_)
 Symbolic function corresponding to the infix operator |is|_.
 """
 
-def _add_(x: symbol, y: symbol) -> symbol:
+def _add_(x: symbol, y: symbol, *zs: symbol) -> symbol:
     """
     >>> isinstance(add_(symbol(2), symbol(3)), symbol)
     True
     >>> add_.instance(2, 3)
     5
+    >>> add_.instance(2, 3, 4)
+    9
     """
-    return x + y
+    x = x + y
+    for z in zs:
+        x = x + z
+    return x
 
 add_ = symbol(_add_)
 """Alias for :obj:`symbol.__add__`."""
 
-def _sub_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(sub_(symbol(2), symbol(3)), symbol)
-    True
-    >>> sub_.instance(2, 3)
-    -1
-    """
-    return x - y
-
-sub_ = symbol(_sub_)
+sub_ = symbol(operator.sub)
 """Alias for :obj:`symbol.__sub__`."""
 
-def _mul_(x: symbol, y: symbol) -> symbol:
+def _mul_(x: symbol, y: symbol, *zs: symbol) -> symbol:
     """
     >>> isinstance(mul_(symbol(2), symbol(3)), symbol)
     True
     >>> mul_.instance(2, 3)
     6
+    >>> mul_.instance(2, 3, 4)
+    24
     """
-    return x * y
+    x = x * y
+    for z in zs:
+        x = x * z
+    return x
 
 mul_ = symbol(_mul_)
 """Alias for :obj:`symbol.__mul__`."""
 
-def _matmul_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> class Test:
-    ...     def __matmul__(self, other):
-    ...         return True
-    >>> isinstance(matmul_(symbol(Test()), symbol(Test())), symbol)
-    True
-    >>> matmul_.instance(Test(), Test())
-    True
-    """
-    return x @ y
-
-matmul_ = symbol(_matmul_)
+matmul_ = symbol(operator.matmul)
 """Alias for :obj:`symbol.__matmul__`."""
 
-def _div_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(div_(symbol(5), symbol(2)), symbol)
-    True
-    >>> div_.instance(5, 2)
-    2.5
-    """
-    return x / y
-
-truediv_ = symbol(_div_)
+truediv_ = symbol(operator.truediv)
 """Alias for :obj:`symbol.__truediv__`."""
 
 div_ = truediv_
 """Concise alias for :obj:`symbol.__truediv__`."""
 
-def _floordiv_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(floordiv_(symbol(5), symbol(2)), symbol)
-    True
-    >>> floordiv_.instance(5, 2)
-    2
-    """
-    return x // y
-
-floordiv_ = symbol(_floordiv_)
+floordiv_ = symbol(operator.floordiv)
 """Alias for :obj:`symbol.__floordiv__`."""
 
-def _mod_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(mod_(symbol(5), symbol(2)), symbol)
-    True
-    >>> mod_.instance(5, 2)
-    1
-    """
-    return x % y
-
-mod_ = symbol(_mod_)
+mod_ = symbol(operator.mod)
 """Alias for :obj:`symbol.__mod__`."""
 
-def _pow_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(pow_(symbol(2), symbol(3)), symbol)
-    True
-    >>> pow_.instance(2, 3)
-    8
-    """
-    return x ** y
-
-pow_ = symbol(_pow_)
+pow_ = symbol(operator.pow)
 """Alias for :obj:`symbol.__pow__`."""
 
-def _lshift_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(lshift_(symbol(4), symbol(2)), symbol)
-    True
-    >>> lshift_.instance(4, 2)
-    16
-    """
-    return x << y
-
-lshift_ = symbol(_lshift_)
+lshift_ = symbol(operator.lshift)
 """Alias for :obj:`symbol.__lshift__`."""
 
-def _rshift_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(rshift_(symbol(16), symbol(2)), symbol)
-    True
-    >>> rshift_.instance(16, 2)
-    4
-    """
-    return x >> y
-
-rshift_ = symbol(_rshift_)
+rshift_ = symbol(operator.rshift)
 """Alias for :obj:`symbol.__rshift__`."""
 
-def _bitand_(x: symbol, y: symbol) -> symbol:
+def _bitand_(x: symbol, y: symbol, *zs: symbol) -> symbol:
     """
     >>> isinstance(bitand_(symbol({1, 2}), symbol({2, 3})), symbol)
     True
     >>> bitand_.instance({1, 2}, {2, 3})
     {2}
+    >>> bitand_.instance({1, 2}, {2, 3}, {2, 4})
+    {2}
     """
-    return x & y
+    x = x & y
+    for z in zs:
+        x = x & z
+    return x
 
 bitand_ = symbol(_bitand_)
 """Alias for :obj:`symbol.__and__`."""
@@ -646,29 +2011,25 @@ bitand_ = symbol(_bitand_)
 amp_ = bitand_
 """Concise alias for :obj:`symbol.__and__`."""
 
-def _bitxor_(x: symbol, y: symbol) -> symbol:
-    """
-    >>> isinstance(bitxor_(symbol({1, 2}), symbol({2, 3})), symbol)
-    True
-    >>> bitxor_.instance({1, 2}, {2, 3})
-    {1, 3}
-    """
-    return x ^ y
-
-bitxor_ = symbol(_bitxor_)
+bitxor_ = symbol(operator.xor)
 """Alias for :obj:`symbol.__xor__`."""
 
 xor_ = bitxor_ # Concise synonym
 """Concise alias for :obj:`symbol.__xor__`."""
 
-def _bitor_(x: symbol, y: symbol) -> symbol:
+def _bitor_(x: symbol, y: symbol, *zs: symbol) -> symbol:
     """
     >>> isinstance(bitor_(symbol({1, 2}), symbol({2, 3})), symbol)
     True
     >>> bitor_.instance({1, 2}, {2, 3})
     {1, 2, 3}
+    >>> bitor_.instance({1}, {2}, {3})
+    {1, 2, 3}
     """
-    return x | y
+    x = x | y
+    for z in zs:
+        x = x | z
+    return x
 
 bitor_ = symbol(_bitor_)
 """Alias for :obj:`symbol.__or__`."""
@@ -676,119 +2037,491 @@ bitor_ = symbol(_bitor_)
 bar_ = bitor_
 """Concise alias for :obj:`symbol.__or__`."""
 
-def _invert_(x: symbol) -> symbol:
-    """
-    >>> isinstance(invert_(symbol(2)), symbol)
-    True
-    >>> invert_.instance(2)
-    -3
-    """
-    return ~x
-
-invert_ = symbol(_invert_)
+invert_ = symbol(operator.invert)
 """Alias for :obj:`symbol.__invert__`."""
 
-def _pos_(x: symbol) -> symbol:
-    """
-    >>> isinstance(pos_(symbol(3)), symbol)
-    True
-    >>> pos_.instance(3)
-    3
-    """
-    return +x
-
-pos_ = symbol(_pos_)
+pos_ = symbol(operator.pos)
 """Alias for :obj:`symbol.__pos__`."""
 
 uadd_ = pos_
 """Alias for :obj:`symbol.__pos__` (alluding to the name of :obj:`ast.UAdd`)."""
 
-def _neg_(x: symbol) -> symbol:
-    """
-    >>> isinstance(neg_(symbol(3)), symbol)
-    True
-    >>> neg_.instance(3)
-    -3
-    """
-    return -x
-
-neg_ = symbol(_neg_)
+neg_ = symbol(operator.neg)
 """Alias for :obj:`symbol.__neg__`."""
 
 usub_ = neg_
 """Alias for :obj:`symbol.__neg__` (alluding to the name of :obj:`ast.USub`)."""
 
-def _eq_(x: symbol, y: symbol) -> symbol:
+eq_ = symbol(operator.eq)
+"""Alias for :obj:`symbol.__eq__`."""
+
+ne_ = symbol(operator.ne)
+"""Alias for :obj:`symbol.__ne__`."""
+
+lt_ = symbol(operator.lt)
+"""Alias for :obj:`symbol.__lt__`."""
+
+le_ = symbol(operator.le)
+"""Alias for :obj:`symbol.__le__`."""
+
+gt_ = symbol(operator.gt)
+"""Alias for :obj:`symbol.__gt__`."""
+
+ge_ = symbol(operator.ge)
+"""Alias for :obj:`symbol.__ge__`."""
+
+class compiled: # pylint: disable=too-few-public-methods
     """
-    >>> isinstance(eq_(symbol(3), symbol(2)), symbol)
-    True
-    >>> eq_.instance(3, 2)
-    False
+    Flat representation of a symbolic expression (produced by
+    :obj:`symbol.compile_flat`) that consists of three parallel lists. Each
+    entry corresponds to a distinct application or to an occurrence of a leaf
+    instance, and entries appear in post-order (so the entry for the root
+    expression is the last one). The entries of a leaf instance are ``None``,
+    an empty :obj:`tuple`, and its value. The entries of an application are
+    the function, a :obj:`tuple` of the indices of the entries for its
+    parameters, and ``None``.
+
+    >>> c = (symbol(abs)(symbol(-2)) * symbol(3)).compile_flat()
+    >>> (c.operations[1], c.indices, c.constants)
+    (<built-in function abs>, [(), (0,), (), (1, 2)], [-2, None, 3, None])
+    >>> c()
+    6
+
+    Note that both parameters of any application of :obj:`and_` or :obj:`or_`
+    are evaluated.
     """
-    return x == y
+    __slots__ = ('operations', 'indices', 'constants', 'leaves')
 
-eq_ = symbol(_eq_)
-"""Alias for :obj:`symbol.__eq__`."""
+    def __init__(self: compiled, operations: list, indices: list, constants: list):
+        self.operations = operations
+        self.indices = indices
+        self.constants = constants
+        # Indices of the entries of the leaf instances (in order).
+        self.leaves = [i for (i, function) in enumerate(operations) if function is None]
 
-def _ne_(x: symbol, y: symbol) -> symbol:
+    def __call__(self: compiled, *leaves: Any) -> Any:
+        """
+        Evaluate the expression by computing the value of every entry in order.
+        Values can be supplied for the leaf instances (in the order of their
+        entries), in which case they are used in place of the stored values.
+
+        >>> c = (symbol(abs)(symbol(-2)) * symbol(3)).compile_flat()
+        >>> c()
+        6
+        >>> c(-4, 5)
+        20
+        >>> symbol(lambda: 7)().compile_flat()()
+        7
+        """
+        values = list(self.constants)
+        for (index, value) in zip(self.leaves, leaves):
+            values[index] = value
+
+        # Unary and binary applications avoid building an argument list.
+        for (index, (function, indices)) in enumerate(zip(self.operations, self.indices)):
+            if function is None:
+                continue
+            arity = len(indices)
+            if arity == 2:
+                values[index] = function(values[indices[0]], values[indices[1]])
+            elif arity == 1:
+                values[index] = function(values[indices[0]])
+            else:
+                values[index] = function(*[values[i] for i in indices])
+
+        return values[-1]
+
+def group_and_compile(expressions: Iterable[symbol]) -> list:
+    """
+    Group symbolic expressions that have the same structure (*i.e.*, that differ
+    only in the values of their leaf instances) and compile one representative
+    of each group using :obj:`symbol.compile_flat`. A list of triples is
+    returned. Each triple consists of the :obj:`compiled` representative, the
+    positions of the expressions in the group (within the supplied iterable),
+    and a :obj:`tuple` of the leaf values of each expression in the group.
+
+    >>> inc = symbol(lambda x: x + 1)
+    >>> groups = group_and_compile([
+    ...     inc(symbol(1)) * inc(symbol(2)),
+    ...     symbol(3) + symbol(4),
+    ...     inc(symbol(5)) * inc(symbol(6))
+    ... ])
+    >>> [(positions, leaves) for (_, positions, leaves) in groups]
+    [([0, 2], [(1, 2), (5, 6)]), ([1], [(7,)])]
+    >>> [[c(*values) for values in leaves] for (c, _, leaves) in groups]
+    [[6, 42], [7]]
+
+    Every occurrence of a leaf instance corresponds to its own entry, so
+    expressions are grouped regardless of whether their leaf instances are
+    shared.
+
+    >>> (x, y) = (symbol([1]), symbol([2]))
+    >>> [(positions, leaves) for (_, positions, leaves) in group_and_compile([x + x, x + y])]
+    [([0, 1], [([1], [1]), ([1], [2])])]
+    >>> three = symbol(3)
+    >>> groups = group_and_compile([
+    ...     inc(three) * inc(three),
+    ...     inc(symbol(1)) * inc(symbol(2))
+    ... ])
+    >>> [(positions, leaves) for (_, positions, leaves) in groups]
+    [([0, 1], [(3, 3), (1, 2)])]
+    """
+    groups = {}
+    flattened = [] # Keeps the functions alive so that their identifiers are stable.
+    for (position, expression) in enumerate(expressions):
+        c = expression.compile_flat()
+        flattened.append(c)
+        key = (tuple(id(function) for function in c.operations), tuple(c.indices))
+        if key not in groups:
+            groups[key] = (c, [], [])
+        groups[key][1].append(position)
+        groups[key][2].append(tuple(c.constants[i] for i in c.leaves))
+
+    return list(groups.values())
+
+def _combine(instance: Callable, arguments: list) -> Any:
     """
-    >>> isinstance(ne_(symbol(3), symbol(2)), symbol)
+    Apply an instance to arguments that are each represented by a pair, where
+    the pair consists of either a future and ``None`` or ``None`` and a value
+    (used by :obj:`symbol.evaluate_async`).
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> with ThreadPoolExecutor() as executor:
+    ...     future = executor.submit(abs, -2)
+    ...     _combine(operator.add, [(future, None), (None, 3)])
+    5
+    """
+    return instance(*[
+        value if future is None else future.result()
+        for (future, value) in arguments
+    ])
+
+def _fold(instance: Callable, parameters: tuple) -> Optional[symbol]:
+    """
+    Apply a pure instance to the values of leaf parameters (used by
+    :obj:`symbol._apply` and :obj:`symbol._apply2`). A leaf instance that has
+    the result as its value is returned if folding is enabled, if every
+    parameter is a leaf that has an immutable value, and if the computation
+    succeeds. Otherwise, ``None`` is returned.
+
+    >>> _fold(operator.add, (symbol(2), symbol(3))).instance
+    5
+    >>> _fold(operator.add, (symbol(2), symbol(3) + symbol(4))).instance
+    9
+    >>> _fold(operator.add, (symbol((1,)), symbol(([2],)))) is None
     True
-    >>> ne_.instance(3, 2)
+    >>> _fold(operator.truediv, (symbol(1), symbol(0))) is None
     True
     """
-    return x != y
+    if not SYMBOLISM_FOLD:
+        return None
+
+    # The values of leaf instances are constant exactly if they are immutable
+    # (see :obj:`symbol.__init__`).
+    for p in parameters:
+        if not (
+            isinstance(p, symbol) and p._leaf and p._constant # pylint: disable=protected-access
+        ):
+            return None
 
-ne_ = symbol(_ne_)
-"""Alias for :obj:`symbol.__ne__`."""
+    try:
+        return symbol(instance(*[p.instance for p in parameters]))
+    except Exception: # pylint: disable=broad-except
+        return None
 
-def _lt_(x: symbol, y: symbol) -> symbol:
+def _llvm(s: symbol, variables: tuple) -> Callable[..., float]: # pylint: disable=too-many-locals
     """
-    >>> isinstance(lt_(symbol(3), symbol(2)), symbol)
-    True
-    >>> lt_.instance(3, 2)
+    Generate LLVM IR for a symbolic expression in which all values are
+    double-precision floating-point numbers, compile it, and return a function
+    that executes it (used by :obj:`symbol.jit_llvm`). An exception is raised if
+    llvmlite is not installed or if the expression is not supported.
+    """
+    # pylint: disable=import-outside-toplevel,import-error
+    import ctypes
+    from llvmlite import ir, binding
+
+    double = ir.DoubleType()
+    module = ir.Module()
+    module.triple = binding.get_default_triple()
+    function = ir.Function(module, ir.FunctionType(double, [double] * len(variables)), 'f')
+    builder = ir.IRBuilder(function.append_basic_block())
+
+    values = dict(zip((id(variable) for variable in variables), function.args))
+    for node in _postorder(s, lambda node: id(node) in values, True):
+        if node._leaf: # pylint: disable=protected-access
+            if not isinstance(node.instance, (int, float)):
+                raise ValueError('expression cannot be compiled using llvmlite')
+            values[id(node)] = ir.Constant(double, float(node.instance))
+        else:
+            operands = [values[id(parameter)] for parameter in _operands(node)]
+            (name, arity) = _instructions.get(id(node.instance), (None, 0))
+            if name is None or not (
+                len(operands) == arity or
+                (id(node.instance) in _chains and len(operands) > arity)
+            ):
+                raise ValueError('expression cannot be compiled using llvmlite')
+
+            if name == 'llvm.pow':
+                intrinsic = module.declare_intrinsic(name, [double])
+                values[id(node)] = builder.call(intrinsic, operands)
+            elif arity == 1:
+                # Multiplication preserves the sign of zero (unlike subtraction).
+                values[id(node)] = (
+                    operands[0] if name == 'pos' else
+                    builder.fmul(ir.Constant(double, -1.0), operands[0])
+                )
+            else:
+                # Apply the binary instruction from left to right.
+                value = operands[0]
+                for operand in operands[1:]:
+                    value = getattr(builder, name)(value, operand)
+                values[id(node)] = value
+
+    builder.ret(values[id(s)])
+
+    try:
+        binding.initialize() # Only required (and permitted) by older versions.
+    except RuntimeError:
+        pass
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+    engine = binding.create_mcjit_compiler(
+        binding.parse_assembly(str(module)),
+        binding.Target.from_default_triple().create_target_machine()
+    )
+    engine.finalize_object()
+    kernel = ctypes.CFUNCTYPE(*[ctypes.c_double] * (len(variables) + 1))(
+        engine.get_function_address('f')
+    )
+
+    def run(*arguments: float) -> float:
+        return kernel(*arguments)
+
+    run.engine = engine # The compiled code is freed when the engine is collected.
+    return run
+
+def _leaf_key(instance: Any) -> tuple:
+    """
+    Build a key for a leaf value that distinguishes values of different types
+    (such as ``1`` and ``True``) and floating-point zeros of opposite signs,
+    including when they appear within tuples and frozen sets.
+
+    >>> _leaf_key(1) == _leaf_key(True) or _leaf_key(0.0) == _leaf_key(-0.0)
+    False
+    >>> _leaf_key((1,)) == _leaf_key((True,)) or _leaf_key((0.0,)) == _leaf_key((-0.0,))
+    False
+    >>> _leaf_key(frozenset([1])) == _leaf_key(frozenset([True]))
     False
+    >>> _leaf_key((1, (2.0,))) == _leaf_key((1, (2.0,)))
+    True
     """
-    return x < y
+    if isinstance(instance, tuple):
+        return (type(instance), tuple(_leaf_key(item) for item in instance), None)
 
-lt_ = symbol(_lt_)
-"""Alias for :obj:`symbol.__lt__`."""
+    if isinstance(instance, frozenset):
+        return (type(instance), frozenset(_leaf_key(item) for item in instance), None)
+
+    return (
+        type(instance), instance,
+        repr(instance) if isinstance(instance, (float, complex)) else None
+    )
 
-def _le_(x: symbol, y: symbol) -> symbol:
+def _short_circuits(s: symbol) -> bool:
     """
-    >>> isinstance(le_(symbol(3), symbol(2)), symbol)
+    Determine whether the parameters of a symbolic expression should be
+    evaluated according to the short-circuit semantics of ``and`` and ``or``.
+
+    >>> _short_circuits(and_(symbol(True), symbol(abs)(symbol(-2))))
     True
-    >>> le_.instance(3, 2)
+    >>> _short_circuits(symbol(1) + symbol(2))
     False
     """
-    return x <= y
-
-le_ = symbol(_le_)
-"""Alias for :obj:`symbol.__le__`."""
+    return (s.instance is _and_ or s.instance is _or_) and len(s.parameters) == 2
 
-def _gt_(x: symbol, y: symbol) -> symbol:
+def _postorder(
+        s: symbol,
+        skip: Optional[Callable[[symbol], bool]] = None,
+        flatten: bool = False
+    ) -> Iterable[symbol]:
     """
-    >>> isinstance(gt_(symbol(3), symbol(2)), symbol)
-    True
-    >>> gt_.instance(3, 2)
-    True
+    Yield every distinct node within a symbolic expression after all of its
+    parameters (which are visited from left to right) without relying on
+    recursion. Nodes that satisfy the supplied predicate are neither yielded
+    nor traversed. If chains are flattened, the operands of every node (see
+    :obj:`_operands`) are visited in place of its parameters.
+
+    >>> x = symbol([1])
+    >>> e = symbol(abs)(x) + x
+    >>> [n is x for n in _postorder(e)]
+    [True, False, False]
+    >>> len(list(_postorder(e, lambda n: n is x)))
+    2
+    >>> len(list(_postorder(x + x + x))), len(list(_postorder(x + x + x, flatten=True)))
+    (3, 2)
     """
-    return x > y
-
-gt_ = symbol(_gt_)
-"""Alias for :obj:`symbol.__gt__`."""
+    visited = set()
+    work = [(s, False)]
+    while len(work) > 0:
+        (node, expanded) = work.pop()
+        if id(node) in visited:
+            continue
+        if expanded:
+            visited.add(id(node))
+            yield node
+        elif skip is not None and skip(node):
+            visited.add(id(node))
+        else:
+            work.append((node, True))
+            work.extend(
+                (p, False)
+                for p in reversed(_operands(node) if flatten else node.parameters)
+                if isinstance(p, symbol)
+            )
 
-def _ge_(x: symbol, y: symbol) -> symbol:
+def _occur(s: symbol, leaves: Iterable) -> bool:
     """
-    >>> isinstance(ge_(symbol(3), symbol(2)), symbol)
-    True
-    >>> ge_.instance(3, 2)
-    True
+    Determine whether every one of the supplied objects is a leaf instance that
+    occurs within a symbolic expression (used to validate the arguments of
+    methods that refer to leaf instances).
+
+    >>> (x, y) = (symbol([1]), symbol([2]))
+    >>> (_occur(x + x, [x]), _occur(x + x, [x, y]), _occur(x, [x, 1]))
+    (True, False, False)
     """
-    return x >= y
+    identifiers = {id(node) for node in _postorder(s) if node._leaf} # pylint: disable=protected-access
+    return all(id(leaf) in identifiers for leaf in leaves)
 
-ge_ = symbol(_ge_)
-"""Alias for :obj:`symbol.__ge__`."""
+def _operands(s: symbol) -> tuple:
+    """
+    Return the parameters of an application of an operator that accepts any
+    number of parameters (see :obj:`_chains`), in which every left-hand
+    parameter that is an application of the same operator and that is not a
+    parameter of any other application is replaced with its own parameters
+    (used when compiling expressions). The parameters of all other nodes are
+    returned unchanged. Because the operators are applied from left to right,
+    the result is the same as that of the nested applications (even if the
+    operator is not associative for the parameter values).
+
+    >>> x = symbol([1])
+    >>> (len(_operands(x + x + x + x)), len(_operands(x + (x + x))), len(_operands(x * x + x)))
+    (4, 2, 2)
+    >>> y = x + x
+    >>> (len(_operands(y + x)), len(_operands(y + y)))
+    (3, 2)
+    """
+    # pylint: disable=protected-access
+    parameters = s.parameters
+    if id(s.instance) not in _chains or s._kwnames is not None:
+        return parameters
+
+    tails = []
+    while len(parameters) > 0 and isinstance(parameters[0], symbol):
+        left = parameters[0]
+        if (
+            left._leaf or left.instance is not s.instance or
+            left._kwnames is not None or left._uses != 1
+        ):
+            break
+        tails.append(parameters[1:])
+        parameters = left.parameters
+
+    return parameters + tuple(p for tail in reversed(tails) for p in tail)
+
+# Templates for the Python source code that corresponds to each of the functions
+# wrapped by the constants above (used by :obj:`symbol.njit`).
+_templates = {
+    id(function): template
+    for (function, template) in [
+        (_and_, '({0}) and ({1})'),
+        (_or_, '({0}) or ({1})'),
+        (_not_, 'not ({0})'),
+        (_in_, '({0}) in ({1})'),
+        (operator.is_, '({0}) is ({1})'),
+        (_add_, '({0}) + ({1})'),
+        (operator.sub, '({0}) - ({1})'),
+        (_mul_, '({0}) * ({1})'),
+        (operator.matmul, '({0}) @ ({1})'),
+        (operator.truediv, '({0}) / ({1})'),
+        (operator.floordiv, '({0}) // ({1})'),
+        (operator.mod, '({0}) % ({1})'),
+        (operator.pow, '({0}) ** ({1})'),
+        (operator.lshift, '({0}) << ({1})'),
+        (operator.rshift, '({0}) >> ({1})'),
+        (_bitand_, '({0}) & ({1})'),
+        (operator.xor, '({0}) ^ ({1})'),
+        (_bitor_, '({0}) | ({1})'),
+        (operator.invert, '~({0})'),
+        (operator.pos, '+({0})'),
+        (operator.neg, '-({0})'),
+        (operator.eq, '({0}) == ({1})'),
+        (operator.ne, '({0}) != ({1})'),
+        (operator.lt, '({0}) < ({1})'),
+        (operator.le, '({0}) <= ({1})'),
+        (operator.gt, '({0}) > ({1})'),
+        (operator.ge, '({0}) >= ({1})')
+    ]
+}
+
+# Names (and numbers of operands) of the LLVM instructions that correspond to
+# some of the functions wrapped by the constants above (used by :obj:`_llvm`).
+_instructions = {
+    id(function): instruction
+    for (function, instruction) in [
+        (_add_, ('fadd', 2)), (operator.sub, ('fsub', 2)), (_mul_, ('fmul', 2)),
+        (operator.truediv, ('fdiv', 2)), (operator.pow, ('llvm.pow', 2)),
+        (operator.pos, ('pos', 1)), (operator.neg, ('neg', 1))
+    ]
+}
+
+# Names of the NumPy functions that correspond to each of the functions wrapped
+# by the constants above (used by :obj:`symbol.evaluate_numpy`).
+_ufuncs = {
+    id(function): name
+    for (function, name) in [
+        (_and_, 'logical_and'), (_or_, 'logical_or'), (_not_, 'logical_not'),
+        (_add_, 'add'), (operator.sub, 'subtract'), (_mul_, 'multiply'),
+        (operator.matmul, 'matmul'), (operator.truediv, 'true_divide'),
+        (operator.floordiv, 'floor_divide'), (operator.mod, 'remainder'),
+        (operator.pow, 'power'), (operator.lshift, 'left_shift'),
+        (operator.rshift, 'right_shift'), (_bitand_, 'bitwise_and'),
+        (operator.xor, 'bitwise_xor'), (_bitor_, 'bitwise_or'),
+        (operator.invert, 'invert'), (operator.pos, 'positive'),
+        (operator.neg, 'negative'), (operator.eq, 'equal'), (operator.ne, 'not_equal'),
+        (operator.lt, 'less'), (operator.le, 'less_equal'),
+        (operator.gt, 'greater'), (operator.ge, 'greater_equal')
+    ]
+}
+
+# Functions wrapped by the constants above that accept any number of parameters
+# (see :obj:`_operands`).
+_chains = {id(_add_), id(_mul_), id(_bitand_), id(_bitor_)}
+
+# Built-in functions that are equivalent to the functions wrapped by some of the
+# constants above (when applied to one or two parameters).
+for (_operator, _function) in (
+    (not_, operator.not_), (is_, operator.is_),
+    (add_, operator.add), (sub_, operator.sub), (mul_, operator.mul),
+    (matmul_, operator.matmul), (truediv_, operator.truediv),
+    (floordiv_, operator.floordiv), (mod_, operator.mod), (pow_, operator.pow),
+    (lshift_, operator.lshift), (rshift_, operator.rshift),
+    (bitand_, operator.and_), (bitxor_, operator.xor), (bitor_, operator.or_),
+    (invert_, operator.invert), (pos_, operator.pos), (neg_, operator.neg),
+    (eq_, operator.eq), (ne_, operator.ne), (lt_, operator.lt),
+    (le_, operator.le), (gt_, operator.gt), (ge_, operator.ge)
+):
+    _operator._function = _function # pylint: disable=protected-access
+
+# All of the functions wrapped by the constants above are pure.
+_pure = {
+    id(_operator.instance) for _operator in (
+        and_, or_, not_, in_, is_,
+        add_, sub_, mul_, matmul_, truediv_, floordiv_, mod_, pow_,
+        lshift_, rshift_, bitand_, bitxor_, bitor_,
+        invert_, pos_, neg_,
+        eq_, ne_, lt_, le_, gt_, ge_
+    )
+}
 
 if __name__ == '__main__':
+    import doctest # pragma: no cover
     doctest.testmod() # pragma: no cover